@@ -0,0 +1,124 @@
+"""
+Offline index builder for ArchiCodeGuide.
+
+Converts the chunked NBC data produced by PDFProcessor.process_pdf (stored
+today as nbc_fire_and_life_safety.pkl) into a memory-mappable Arrow IPC
+file, so the chat app can load the corpus with a zero-copy read instead of
+unpickling a full Python object graph on every cold start.
+
+Usage:
+    python build_index.py                    # rebuild artifacts from the pickle
+    python build_index.py a.pdf b.pdf ...    # ingest PDFs first, then build
+"""
+import os
+import pickle
+import asyncio
+import argparse
+
+import numpy as np
+import pyarrow as pa
+from dotenv import load_dotenv
+from langchain_openai import OpenAIEmbeddings
+
+from extract_and_chunk import PDFProcessor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PICKLE_PATH = os.path.join(BASE_DIR, 'nbc_fire_and_life_safety.pkl')
+ARROW_PATH = os.path.join(BASE_DIR, 'nbc_fire_and_life_safety.arrow')
+VECTORS_PATH = os.path.join(BASE_DIR, 'nbc_vectors.npy')
+SCALES_PATH = os.path.join(BASE_DIR, 'nbc_vector_scales.npy')
+
+
+def write_arrow(nbc_data, arrow_path=ARROW_PATH):
+    """
+    Write the chunks and metadatas columns as an Arrow IPC file.
+
+    :param nbc_data: Output dictionary from PDFProcessor.process_pdf.
+    :param arrow_path: Destination path for the Arrow file.
+    """
+    table = pa.table({
+        "text": pa.array(nbc_data["chunks"], type=pa.large_string()),
+        "meta": pa.array(nbc_data["metadatas"], type=pa.large_string()),
+    })
+    with pa.OSFile(arrow_path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def write_vectors(nbc_data, vectors_path=VECTORS_PATH, scales_path=SCALES_PATH):
+    """
+    Embed the chunks once and persist the vectors to disk as int8.
+
+    The corpus is fixed, so the OpenAI embedding calls only ever need to
+    happen here; the chat app loads the saved arrays instead of hitting the
+    API at session start. Symmetric int8 quantization with one scale per
+    vector cuts the footprint 4x versus FP32 with negligible effect on
+    retrieval quality.
+
+    :param nbc_data: Output dictionary from PDFProcessor.process_pdf.
+    :param vectors_path: Destination path for the quantized .npy file.
+    :param scales_path: Destination path for the per-vector scales.
+    """
+    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+    vectors = np.asarray(embeddings.embed_documents(nbc_data["chunks"]), dtype=np.float32)
+
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+
+    np.save(vectors_path, quantized)
+    np.save(scales_path, scales)
+
+
+async def process_pdfs(pdf_paths, concurrency=8):
+    """
+    Analyze the given PDFs concurrently and merge their outputs.
+
+    Azure DI spends most of its ~10s per document service-side, so fanning
+    the batch out with a bounded semaphore overlaps that latency across
+    files instead of paying it serially.
+
+    :param pdf_paths: List of PDF file paths to ingest.
+    :param concurrency: Maximum number of documents in flight at once.
+    :return: A single merged chunks/metadatas dictionary.
+    """
+    processor = PDFProcessor(
+        azure_endpoint=os.environ["AZURE_DOC_INTEL_ENDPOINT"],
+        azure_key=os.environ["AZURE_DOC_INTEL_API_KEY"],
+    )
+    results = await processor.process_pdf_batch(pdf_paths, concurrency=concurrency)
+
+    # Merge in the order the paths were given, independent of completion order.
+    nbc_data = {"chunks": [], "metadatas": []}
+    for path in pdf_paths:
+        nbc_data["chunks"].extend(results[path]["chunks"])
+        nbc_data["metadatas"].extend(results[path]["metadatas"])
+    return nbc_data
+
+
+def main():
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Build the ArchiCodeGuide retrieval artifacts.")
+    parser.add_argument("pdfs", nargs="*", help="PDF files to ingest; defaults to the existing pickle")
+    parser.add_argument("--concurrency", type=int, default=8, help="maximum PDFs in flight at once")
+    args = parser.parse_args()
+
+    if args.pdfs:
+        nbc_data = asyncio.run(process_pdfs(args.pdfs, concurrency=args.concurrency))
+        with open(PICKLE_PATH, "wb") as f:
+            pickle.dump(nbc_data, f)
+        print(f"Wrote {PICKLE_PATH}")
+    else:
+        with open(PICKLE_PATH, "rb") as f:
+            nbc_data = pickle.load(f)
+
+    write_arrow(nbc_data)
+    print(f"Wrote {ARROW_PATH}")
+
+    write_vectors(nbc_data)
+    print(f"Wrote {VECTORS_PATH} and {SCALES_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,226 @@
 import os
+import asyncio
+import aiofiles
+import numpy as np
 from azure.ai.formrecognizer import DocumentAnalysisClient
+from azure.ai.formrecognizer.aio import DocumentAnalysisClient as AsyncDocumentAnalysisClient
 from azure.core.credentials import AzureKeyCredential
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the NumPy ray cast
+    njit = None
+
+try:
+    from rtree import index as rtree_index
+except ImportError:  # rtree is optional; fall back to the linear bbox scan
+    rtree_index = None
+
+# Below this many tables a linear bbox scan beats the R-tree's build and
+# query overhead.
+_RTREE_MIN_TABLES = 8
+
+
+def _replace_with_nearest_positive(page_numbers):
+    """
+    Replace each -1 with the nearest page number to its right; trailing -1s
+    fall back to the leftmost page number. Vectorized backward fill.
+
+    :param page_numbers: List of ints where -1 marks "unknown page".
+    :return: List with every -1 replaced (unchanged if no page number exists).
+    """
+    arr = np.asarray(page_numbers)
+    mask = arr != -1
+    if not mask.any():
+        return page_numbers
+
+    # Backward fill = forward fill over the reversed array: carry the index
+    # of the most recent real value along with maximum.accumulate.
+    rev = arr[::-1]
+    idx = np.where(mask[::-1], np.arange(len(arr)), 0)
+    np.maximum.accumulate(idx, out=idx)
+    filled = rev[idx][::-1]
+
+    # Trailing -1s have no real value to their right; use the leftmost one.
+    filled[filled == -1] = arr[mask][0]
+    return filled.tolist()
+
+
+def _table_to_markdown(table_rows):
+    """
+    Render a 2-D grid of cell strings as a Markdown table.
+
+    :param table_rows: List of rows, each a list of cell strings.
+    :return: Markdown representation of the table.
+    """
+    def row_to_md(row):
+        return "| " + " | ".join(row) + " |"
+
+    markdown_output = []
+    markdown_output.append(row_to_md(table_rows[0]))  # Header row
+    markdown_output.append("|" + " --- |" * len(table_rows[0]))  # Separator
+    for row in table_rows[1:]:
+        markdown_output.append(row_to_md(row))
+
+    return "\n".join(markdown_output)
+
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def _pip_njit(polygon, x, y):
+        """JIT-compiled ray cast of one point against a (V, 2) float64 polygon."""
+        inside = False
+        n = polygon.shape[0]
+        for i in range(n):
+            x1 = polygon[i, 0]
+            y1 = polygon[i, 1]
+            x2 = polygon[(i + 1) % n, 0]
+            y2 = polygon[(i + 1) % n, 1]
+            if (y1 > y) != (y2 > y) and x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-12) + x1:
+                inside = not inside
+        return inside
+else:
+    _pip_njit = None
 
 
 class PDFProcessor:
-    def __init__(self, azure_endpoint: str, azure_key: str, chunk_size: int = 1000, chunk_overlap: int = 100):
+    def __init__(self, azure_endpoint: str, azure_key: str):
         """
-        Initialize the PDFProcessor with Azure Document Intelligence credentials and chunking parameters.
+        Initialize the PDFProcessor with Azure Document Intelligence credentials.
 
         :param azure_endpoint: Azure Form Recognizer endpoint.
         :param azure_key: Azure Form Recognizer API key.
-        :param chunk_size: Size of each text chunk.
-        :param chunk_overlap: Overlap between consecutive chunks.
         """
-        self.client = DocumentAnalysisClient(endpoint=azure_endpoint, credential=AzureKeyCredential(azure_key))
-        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self._azure_endpoint = azure_endpoint
+        self._credential = AzureKeyCredential(azure_key)
+        self.client = DocumentAnalysisClient(endpoint=azure_endpoint, credential=self._credential)
+        self._aclient = None
+        if _pip_njit is not None:
+            # Pay the one-off JIT compilation cost here rather than on the
+            # first real polygon query.
+            _pip_njit(np.array([(0., 0.), (1., 0.), (1., 1.), (0., 1.)]), 0.5, 0.5)
 
     def _is_point_in_polygon(self, point, polygon):
         """
         Check if a point is inside a polygon using ray casting algorithm.
-        
+
         :param point: (x, y) tuple representing the point
-        :param polygon: List of Points defining the polygon
+        :param polygon: (V, 2) float64 array of polygon vertices
         :return: True if the point is inside the polygon, False otherwise
         """
         x, y = point
-        n = len(polygon)
-        inside = False
-        
-        p1x, p1y = polygon[0].x, polygon[0].y
-        for i in range(n + 1):
-            p2x, p2y = polygon[i % n].x, polygon[i % n].y
-            if y > min(p1y, p2y) and y <= max(p1y, p2y) and x <= max(p1x, p2x):
-                if p1y != p2y:
-                    xinters = (y - p1y) * (p2x - p1x) / (p2y - p1y) + p1x
-                if p1x == p2x or x <= xinters:
-                    inside = not inside
-            p1x, p1y = p2x, p2y
-            
-        return inside
+        if _pip_njit is not None:
+            return bool(_pip_njit(polygon, x, y))
+        # Vectorized ray cast: compare every edge (x1,y1)->(x2,y2) at once
+        # instead of looping over vertices in Python.
+        x1 = polygon[:, 0]
+        y1 = polygon[:, 1]
+        x2 = np.roll(x1, -1)
+        y2 = np.roll(y1, -1)
+        crossings = ((y1 > y) != (y2 > y)) & (x < (x2 - x1) * (y - y1) / (y2 - y1 + 1e-12) + x1)
+        return bool(np.bitwise_xor.reduce(crossings))
     
-    def _is_paragraph_in_table(self, paragraph_bounding_regions, table_polygons):
-        """
-        Check if a paragraph is contained within any table.
+    @staticmethod
+    def _paragraph_centroid(paragraph_bounding_regions):
         """
+        Compute the centroid of a paragraph's centre line polygon.
 
+        :param paragraph_bounding_regions: the paragraph's bounding regions
+        :return: (x, y) tuple of the centroid
+        """
         centre_line = paragraph_bounding_regions[len(paragraph_bounding_regions)//2]
-        line_polygon = centre_line.polygon 
-        center_x = sum(point.x for point in line_polygon) / len(line_polygon)
-        center_y = sum(point.y for point in line_polygon) / len(line_polygon)
-        
+        line_polygon = centre_line.polygon
+        n = len(line_polygon)
+        return sum(point.x for point in line_polygon) / n, sum(point.y for point in line_polygon) / n
 
-        center_point = (center_x, center_y)
-        
-        for table_polygon in table_polygons:
-            if self._is_point_in_polygon(center_point, table_polygon):
-                return True
-                
-        return False
+    def _points_in_polygon(self, xs, ys, polygon):
+        """
+        Vectorized ray cast of many points against one polygon.
+
+        :param xs: (P,) array of point x coordinates
+        :param ys: (P,) array of point y coordinates
+        :param polygon: (V, 2) float64 array of polygon vertices
+        :return: (P,) boolean array, True where the point is inside
+        """
+        x1 = polygon[:, 0]
+        y1 = polygon[:, 1]
+        x2 = np.roll(x1, -1)
+        y2 = np.roll(y1, -1)
+        crossings = ((y1[None, :] > ys[:, None]) != (y2[None, :] > ys[:, None])) & (
+            xs[:, None] < (x2 - x1) * (ys[:, None] - y1) / (y2 - y1 + 1e-12) + x1
+        )
+        return np.bitwise_xor.reduce(crossings, axis=1)
+
+    @staticmethod
+    def _is_axis_aligned_quad(polygon):
+        """
+        Check whether a polygon is an axis-aligned quadrilateral.
+
+        Azure DI table polygons are almost always unrotated rectangles, in
+        which case the bbox test alone decides containment and ray casting
+        can be skipped entirely.
+
+        :param polygon: (V, 2) float64 array of polygon vertices
+        :return: True if the polygon is an axis-aligned quad
+        """
+        return (
+            polygon.shape[0] == 4
+            and np.unique(polygon[:, 0]).size == 2
+            and np.unique(polygon[:, 1]).size == 2
+        )
+
+    def _points_in_any_table(self, centroids, table_polygons, table_bboxes, table_is_rect):
+        """
+        Check which points fall inside any table polygon.
+
+        :param centroids: (P, 2) array of paragraph centroids
+        :param table_polygons: list of (V, 2) polygon arrays
+        :param table_bboxes: list of (min_x, min_y, max_x, max_y) tuples
+        :param table_is_rect: list of bools, True for axis-aligned quads
+        :return: (P,) boolean array, True where the point is inside some table
+        """
+        xs = centroids[:, 0]
+        ys = centroids[:, 1]
+        in_any = np.zeros(len(centroids), dtype=bool)
+
+        if rtree_index is not None and len(table_polygons) >= _RTREE_MIN_TABLES:
+            # Index the table bboxes and query each centroid as a zero-size
+            # box, so every point only ray-casts against O(log T) candidates
+            # instead of scanning all tables.
+            idx = rtree_index.Index(
+                (i, bbox, None) for i, bbox in enumerate(table_bboxes)
+            )
+            for j in range(len(centroids)):
+                point = (xs[j], ys[j])
+                for t in idx.intersection((xs[j], ys[j], xs[j], ys[j])):
+                    # A bbox hit on an axis-aligned table already means
+                    # "inside"; only rotated/irregular polygons need the
+                    # full ray cast.
+                    if table_is_rect[t] or self._is_point_in_polygon(point, table_polygons[t]):
+                        in_any[j] = True
+                        break
+            return in_any
+
+        for polygon, (bx0, by0, bx1, by1), is_rect in zip(table_polygons, table_bboxes, table_is_rect):
+            # Cheap axis-aligned bounding box test first; only ray-cast the
+            # few points whose centroid actually lands in the table's bbox.
+            candidates = (bx0 <= xs) & (xs <= bx1) & (by0 <= ys) & (ys <= by1) & ~in_any
+            if not candidates.any():
+                continue
+            if is_rect:
+                # Bbox hit on an axis-aligned table already means "inside".
+                in_any |= candidates
+                continue
+            idx = np.flatnonzero(candidates)
+            in_any[idx[self._points_in_polygon(xs[idx], ys[idx], polygon)]] = True
+        return in_any
+
+    @property
+    def aclient(self):
+        """Async Document Analysis client, created on first use."""
+        if self._aclient is None:
+            self._aclient = AsyncDocumentAnalysisClient(endpoint=self._azure_endpoint, credential=self._credential)
+        return self._aclient
 
     def process_pdf(self, pdf_path: str):
         """
@@ -77,110 +238,126 @@ class PDFProcessor:
             poller = self.client.begin_analyze_document("prebuilt-document", document=pdf_file)
             result = poller.result()
 
-        # return result
-    
+        return self._build_output(result)
+
+    async def process_pdf_async(self, pdf_path: str):
+        """
+        Async variant of process_pdf using the aio Document Analysis client.
+
+        Awaiting the poller releases the event loop while Azure analyzes the
+        document, so many PDFs can be in flight concurrently (e.g. under
+        asyncio.gather with a semaphore).
+
+        :param pdf_path: Path to the PDF file.
+        :return: A dictionary containing extracted text, tables, and chunked text.
+        """
+
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        async with aiofiles.open(pdf_path, "rb") as pdf_file:
+            document = await pdf_file.read()
+
+        poller = await self.aclient.begin_analyze_document("prebuilt-document", document=document)
+        result = await poller.result()
+
+        return self._build_output(result)
+
+    async def process_pdf_batch(self, pdf_paths, concurrency: int = 10):
+        """
+        Analyze a batch of PDFs concurrently over one shared async client.
+
+        The Form Recognizer SDK has no server-side batch endpoint, so this
+        amortizes connection and auth cost client-side: every document reuses
+        the same aio client while a semaphore bounds how many are in flight.
+
+        :param pdf_paths: Iterable of PDF file paths.
+        :param concurrency: Maximum number of documents in flight at once.
+        :return: A dictionary mapping each path to its process_pdf output.
+        """
+
+        sem = asyncio.Semaphore(concurrency)
+
+        async def analyze(path):
+            async with sem:
+                return await self.process_pdf_async(path)
+
+        pdf_paths = list(pdf_paths)
+        results = await asyncio.gather(*(analyze(path) for path in pdf_paths))
+        return dict(zip(pdf_paths, results))
+
+    def _build_output(self, result):
+        """
+        Turn an analyze-document result into the chunked output dictionary.
+        """
+
         extracted_paragraphs_contents = []
         tables = []
+        table_markdowns = []
         table_polygons = []
+        table_bboxes = []
+        table_is_rect = []
 
-        # First, extract table regions
+        # First, extract table regions: a single pass per table collects the
+        # cells, the Markdown rendering and the bounding geometry together
+        # instead of re-traversing the table once per artifact.
         for table in result.tables:
             table_data = []
+            # Grid pre-sized from the table's declared shape, filled in the
+            # same pass as the cell dicts (no defaultdict indirection).
+            grid = [[""] * table.column_count for _ in range(table.row_count)]
             for cell in table.cells:
                 table_data.append({
                     "row_index": cell.row_index,
                     "column_index": cell.column_index,
                     "content": cell.content
                 })
+                grid[cell.row_index][cell.column_index] = cell.content.strip()
             tables.append(table_data)
-            
-            # Save the table's bounding polygon for later comparison
-            if hasattr(table, 'bounding_regions') and table.bounding_regions:
-                for region in table.bounding_regions:
-                    if hasattr(region, 'polygon'):
-                        table_polygons.append(region.polygon)
+            table_markdowns.append(_table_to_markdown(grid))
+
+            # Save the table's bounding polygon for later comparison.
+            # DocumentTable and BoundingRegion always carry these fields in
+            # the pinned SDK, so access them directly instead of probing
+            # with hasattr on every iteration.
+            for region in table.bounding_regions or ():
+                # Cache the polygon as a contiguous (V, 2) float array so the
+                # point-in-polygon test can run as vector ops instead of
+                # attribute lookups on Point objects.
+                polygon = np.ascontiguousarray([(p.x, p.y) for p in region.polygon], dtype=np.float64)
+                table_polygons.append(polygon)
+                table_bboxes.append((
+                    polygon[:, 0].min(), polygon[:, 1].min(),
+                    polygon[:, 0].max(), polygon[:, 1].max(),
+                ))
+                table_is_rect.append(self._is_axis_aligned_quad(polygon))
         
         # Extract text from paras that are not in tables
-        extracted_paragraphs = []
-        i = 0
-        for paragraph in result.paragraphs:
-            # Skip paras that are within table regions
-            if not self._is_paragraph_in_table(paragraph.bounding_regions, table_polygons):
-                extracted_paragraphs_contents.append(paragraph.content)
-                extracted_paragraphs.append(paragraph)
-
-        def convert_table_to_markdown(table_data):
-            """
-            Convert a table from Azure Document Intelligence format to Markdown.
-            
-            Args:
-                table_data (list): List of dictionary items representing table cells,
-                                each with 'row_index', 'column_index', and 'content' keys.
-            
-            Returns:
-                str: Markdown representation of the table
-            """
-            from collections import defaultdict
-            
-            # Step 1: Organize cells by row and column
-            rows_dict = defaultdict(dict)
-            max_col = 0
-            max_row = 0
-            
-            for cell in table_data:
-                row = cell['row_index']
-                col = cell['column_index']
-                content = cell['content'].strip()
-                rows_dict[row][col] = content
-                max_col = max(max_col, col)
-                max_row = max(max_row, row)
-            
-            # Step 2: Convert to list of rows
-            table_rows = []
-            for row_index in range(max_row + 1):
-                row = []
-                for col_index in range(max_col + 1):
-                    cell_content = rows_dict[row_index].get(col_index, "")
-                    row.append(cell_content)
-                table_rows.append(row)
-            
-            # Step 3: Build Markdown
-            def row_to_md(row):
-                return "| " + " | ".join(row) + " |"
-            
-            markdown_output = []
-            markdown_output.append(row_to_md(table_rows[0]))  # Header row
-            markdown_output.append("|" + " --- |" * len(table_rows[0]))  # Separator
-            for row in table_rows[1:]:
-                markdown_output.append(row_to_md(row))
-            
-            markdown_table = "\n".join(markdown_output)
-            return markdown_table
+        centroids = np.empty((len(result.paragraphs), 2), dtype=np.float64)
+        for i, paragraph in enumerate(result.paragraphs):
+            # The centroid depends only on the paragraph, so compute it
+            # exactly once here rather than once per table comparison.
+            centroids[i] = self._paragraph_centroid(paragraph.bounding_regions)
+
+        # Classify all paragraphs against all tables in one batched query
+        # instead of one call per paragraph per table.
+        in_any_table = self._points_in_any_table(centroids, table_polygons, table_bboxes, table_is_rect)
 
+        # Single streaming pass: keep the content and derive the page-number
+        # stream together, rather than buffering the paragraph objects and
+        # re-traversing them later.
         page_numbers = []
+        for paragraph, in_table in zip(result.paragraphs, in_any_table):
+            # Skip paras that are within table regions
+            if in_table:
+                continue
+            extracted_paragraphs_contents.append(paragraph.content)
+            page_numbers.append(int(paragraph.content) if paragraph.role == "pageNumber" else -1)
 
-        for i in extracted_paragraphs:
-            if i.role == "pageNumber":
-                page_numbers.append(int(i.content))
-            else:
-                page_numbers.append(-1)
-        
-        def replace_with_nearest_positive(arr):
-            # Right-to-left pass
-            last = -1
-            for i in range(len(arr)-1, -1, -1): last = arr[i] = arr[i] if arr[i] != -1 else last
-            
-            # Handle trailing -1s with leftmost non-negative number
-            last = next((x for x in arr if x != -1), -1)
-            for i in range(len(arr)): arr[i] = last if arr[i] == -1 else arr[i]
-            
-            return arr
-        
-        
-        page_numbers = replace_with_nearest_positive(page_numbers)
+        page_numbers = _replace_with_nearest_positive(page_numbers)
         metadatas = [f"Page {i}" for i in page_numbers] + [f"Table: {i+1}" for i in range(len(result.tables))]
 
-        chunks = extracted_paragraphs_contents + [convert_table_to_markdown(i)  for i in tables]
+        chunks = extracted_paragraphs_contents + table_markdowns
 
         return {
             "text": "\n".join(extracted_paragraphs_contents),
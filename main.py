@@ -1,9 +1,10 @@
 import sys
 import os
 import pickle
+import asyncio
+import functools
 
 
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
 from langchain.chains import (
     ConversationalRetrievalChain,
@@ -14,11 +15,97 @@ from langchain_community.chat_message_histories import ChatMessageHistory
 from langchain.memory import ConversationBufferMemory
 from dotenv import load_dotenv
 
+import numpy as np
+import pyarrow as pa
 import chainlit as cl
 
 load_dotenv()
 
-text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=100)
+# Shared across sessions: OpenAIEmbeddings holds an HTTP client that
+# benefits from connection reuse, so build it once at import.
+EMBEDDINGS = OpenAIEmbeddings(model="text-embedding-3-small")
+
+CHROMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chroma_db')
+PICKLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nbc_fire_and_life_safety.pkl')
+ARROW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nbc_fire_and_life_safety.arrow')
+VECTORS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nbc_vectors.npy')
+SCALES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nbc_vector_scales.npy')
+
+
+@functools.lru_cache(maxsize=1)
+def _load_nbc():
+    """Load the chunked NBC data once; later sessions share the same dict."""
+    if os.path.exists(ARROW_PATH):
+        # Memory-mapped, zero-copy read of the Arrow file written by
+        # build_index.py: no per-string PyObject allocation until the
+        # columns are materialized.
+        with pa.memory_map(ARROW_PATH, 'r') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return {"chunks": table["text"].to_pylist(), "metadatas": table["meta"].to_pylist()}
+
+    with open(PICKLE_PATH, 'rb') as file:
+        return pickle.load(file)
+
+# The vector store is shared across sessions: built (and persisted) once,
+# then reused, so new chats don't re-embed every chunk via the OpenAI API.
+_docsearch = None
+_docsearch_lock = asyncio.Lock()
+
+_EMBED_BATCH_SIZE = 256
+_EMBED_CONCURRENCY = 20
+
+
+async def _embed_texts(embeddings, texts):
+    """Embed texts as concurrent batches instead of one serial pass."""
+    sem = asyncio.Semaphore(_EMBED_CONCURRENCY)
+
+    async def embed_batch(batch):
+        async with sem:
+            return await embeddings.aembed_documents(batch)
+
+    batches = [texts[i:i + _EMBED_BATCH_SIZE] for i in range(0, len(texts), _EMBED_BATCH_SIZE)]
+    results = await asyncio.gather(*(embed_batch(batch) for batch in batches))
+    return [vector for batch in results for vector in batch]
+
+
+async def _get_docsearch():
+    """Return the shared Chroma vector store, building it on first use."""
+    global _docsearch
+
+    async with _docsearch_lock:
+        if _docsearch is not None:
+            return _docsearch
+
+        if os.path.isdir(CHROMA_DIR):
+            # Reload the persisted collection instead of re-embedding
+            _docsearch = Chroma(persist_directory=CHROMA_DIR, embedding_function=EMBEDDINGS)
+            return _docsearch
+
+        nbc_data = _load_nbc()
+
+        texts = nbc_data["chunks"]
+        metadatas = [{"source": f"{i}"} for i in nbc_data["metadatas"]]
+
+        if os.path.exists(VECTORS_PATH) and os.path.exists(SCALES_PATH):
+            # Vectors were embedded offline by build_index.py and stored as
+            # int8 with per-vector scales: zero embedding API calls at
+            # startup, and a quarter of the FP32 footprint on disk.
+            quantized = np.load(VECTORS_PATH)
+            scales = np.load(SCALES_PATH)
+            vectors = (quantized.astype(np.float32) * scales[:, None]).tolist()
+        else:
+            # Embed all chunks up front with concurrent batched API calls,
+            # then hand the precomputed vectors straight to Chroma so
+            # indexing never waits on a serial embedding pass.
+            vectors = await _embed_texts(EMBEDDINGS, texts)
+        _docsearch = Chroma(embedding_function=EMBEDDINGS, persist_directory=CHROMA_DIR)
+        await cl.make_async(_docsearch._collection.add)(
+            ids=[str(i) for i in range(len(texts))],
+            embeddings=vectors,
+            documents=texts,
+            metadatas=metadatas,
+        )
+        return _docsearch
 
 
 @cl.on_chat_start
@@ -27,28 +114,14 @@ async def on_chat_start():
     msg = cl.Message(content=f"Welcome to **ArchiCodeGuide**! How can I assist you today?")
     await msg.send()
 
-    pickle_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nbc_fire_and_life_safety.pkl')
-
     # Add error handling
     try:
-        with open(pickle_path, 'rb') as file:
-            nbc_data = pickle.load(file)
+        docsearch = await _get_docsearch()
     except Exception as e:
         # Display error to user
         await cl.Message(content=f"Error loading data: {str(e)}").send()
         return
 
-
-    texts = nbc_data["chunks"]
-    metadatas = [{"source": f"{i}"} for i in nbc_data["metadatas"]]
-
-
-    # Create a Chroma vector store
-    embeddings = OpenAIEmbeddings(model = "text-embedding-3-small")
-    docsearch = await cl.make_async(Chroma.from_texts)(
-        texts, embeddings, metadatas=metadatas
-    )
-
     message_history = ChatMessageHistory()
 
     memory = ConversationBufferMemory(
@@ -82,20 +155,17 @@ async def main(message: cl.Message):
     text_elements = []  # type: List[cl.Text]
 
     if source_documents:
+        source_names = []
         for source_idx, source_doc in enumerate(source_documents):
             source_name = f"source_{source_idx}"
+            source_names.append(source_name)
             # Create the text element referenced in the message
             text_elements.append(
                 cl.Text(
                     content=source_doc.page_content, name=source_name, display="side"
                 )
             )
-        source_names = [text_el.name for text_el in text_elements]
-
-        if source_names:
-            answer += f"\nSources: {', '.join(source_names)}"
-        else:
-            answer += "\nNo sources found"
+        answer += f"\nSources: {', '.join(source_names)}"
 
     await cl.Message(content=answer, elements=text_elements).send()
 